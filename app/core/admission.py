@@ -0,0 +1,165 @@
+import os
+import asyncio
+import json
+from typing import Dict, Tuple
+from dotenv import load_dotenv
+from app.core.database import DB_POOL_SIZE
+from app.core.replicas import REPLICA_CONNECTIONS
+
+# Load environment variables
+load_dotenv()
+
+# Priority classes
+STATIC = "static"          # Template-only section pages and static files
+DB_READ = "db_read"        # Pages backed by Tortoise queries
+OUTBOUND_IO = "outbound"   # Requests that talk to SMTP or other remote services
+
+# Route prefix -> priority class. Anything unmatched is treated as STATIC.
+ROUTE_PRIORITIES: Tuple[Tuple[str, str], ...] = (
+    ("/thoughts", DB_READ),
+    ("/contact", OUTBOUND_IO),
+)
+
+def _lane_setting(priority: str, name: str, default: str) -> float:
+    return float(os.getenv(f"ADMISSION_{priority.upper()}_{name}", default))
+
+# Per-class limits for each worker: (max concurrent, max queued before shedding, deadline seconds)
+LANE_LIMITS: Dict[str, Tuple[int, int, float]] = {
+    STATIC: (
+        int(_lane_setting(STATIC, "CONCURRENCY", "256")),
+        int(_lane_setting(STATIC, "QUEUE", "512")),
+        _lane_setting(STATIC, "DEADLINE", "5"),
+    ),
+    # Admit as many DB-bound requests as the pools serving reads can hold:
+    # one pool per replica, or the primary's alone when none are configured.
+    # Adding replicas raises read capacity; beyond it requests would wait in
+    # asyncpg's pool acquire where nothing sheds them
+    DB_READ: (
+        int(_lane_setting(DB_READ, "CONCURRENCY", str(DB_POOL_SIZE * max(len(REPLICA_CONNECTIONS), 1)))),
+        int(_lane_setting(DB_READ, "QUEUE", "32")),
+        _lane_setting(DB_READ, "DEADLINE", "10"),
+    ),
+    OUTBOUND_IO: (
+        int(_lane_setting(OUTBOUND_IO, "CONCURRENCY", "4")),
+        int(_lane_setting(OUTBOUND_IO, "QUEUE", "8")),
+        _lane_setting(OUTBOUND_IO, "DEADLINE", "20"),
+    ),
+}
+RETRY_AFTER_SECONDS = int(os.getenv("ADMISSION_RETRY_AFTER", "5"))
+
+def get_priority(path: str) -> str:
+    """Classify a request path into a priority class"""
+    for prefix, priority in ROUTE_PRIORITIES:
+        if path == prefix or path.startswith(prefix + "/"):
+            return priority
+    return STATIC
+
+class _Lane:
+    """Concurrency limit plus bounded wait queue for one priority class"""
+
+    def __init__(self, concurrency: int, max_queue: int, deadline: float):
+        self.semaphore = asyncio.Semaphore(concurrency)
+        self.max_queue = max_queue
+        self.deadline = deadline
+        self.waiting = 0
+
+    def is_full(self) -> bool:
+        return self.semaphore.locked() and self.waiting >= self.max_queue
+
+class AdmissionMiddleware:
+    """
+    ASGI middleware that isolates priority classes from each other, sheds load
+    with a fast 503 once a class's queue is full, and enforces a per-request
+    deadline. Hitting the deadline before the response starts cancels the
+    handler task, which cancels the awaited Tortoise query or SMTP send with it.
+    Once headers are sent the lane slot is released and the body streams
+    without a deadline.
+
+    Limits are per worker process; multiply by the worker count for the
+    whole server.
+    """
+
+    def __init__(self, app, lane_limits: Dict[str, Tuple[int, int, float]] = LANE_LIMITS,
+                 retry_after: int = RETRY_AFTER_SECONDS):
+        self.app = app
+        self.lanes = {priority: _Lane(*limits) for priority, limits in lane_limits.items()}
+        self.retry_after = retry_after
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        lane = self.lanes[get_priority(scope["path"])]
+        if lane.is_full():
+            await self._send_error(send, 503, "Server is busy, please retry shortly.")
+            return
+
+        # Requests being profiled (flagged by ProfilingMiddleware once the token
+        # checks out) are exempt from the deadline so slow pages profile fully
+        deadline = None if scope.get("profiling") else lane.deadline
+        loop = asyncio.get_running_loop()
+        expires_at = loop.time() + deadline if deadline is not None else None
+
+        # Time spent queueing counts against the request's deadline
+        lane.waiting += 1
+        try:
+            await asyncio.wait_for(lane.semaphore.acquire(), deadline)
+        except asyncio.TimeoutError:
+            await self._send_error(send, 503, "Server is busy, please retry shortly.")
+            return
+        finally:
+            lane.waiting -= 1
+
+        released = False
+        response_started = asyncio.Event()
+
+        def release():
+            nonlocal released
+            if not released:
+                released = True
+                lane.semaphore.release()
+
+        async def tracked_send(message):
+            if message["type"] == "http.response.start":
+                # The slot and the deadline only cover producing the response;
+                # streaming the body to a slow client must not hold either
+                response_started.set()
+                release()
+            await send(message)
+
+        handler = asyncio.ensure_future(self.app(scope, receive, tracked_send))
+        started = asyncio.ensure_future(response_started.wait())
+        try:
+            await asyncio.wait(
+                {handler, started},
+                timeout=max(expires_at - loop.time(), 0) if expires_at is not None else None,
+                return_when=asyncio.FIRST_COMPLETED,
+            )
+            if not handler.done() and not response_started.is_set():
+                # Deadline hit before any response: cancel the query or send in flight
+                handler.cancel()
+                try:
+                    await handler
+                except asyncio.CancelledError:
+                    pass
+                if not response_started.is_set():
+                    await self._send_error(send, 504, "Request took too long to process.")
+                return
+            await handler
+        finally:
+            started.cancel()
+            if not handler.done():
+                handler.cancel()
+            release()
+
+    async def _send_error(self, send, status_code: int, message: str):
+        body = json.dumps({"success": False, "message": message}).encode()
+        headers = [
+            (b"content-type", b"application/json"),
+            (b"content-length", str(len(body)).encode()),
+        ]
+        if status_code == 503:
+            headers.append((b"retry-after", str(self.retry_after).encode()))
+        await send({"type": "http.response.start", "status": status_code, "headers": headers})
+        await send({"type": "http.response.body", "body": body})
@@ -9,6 +9,9 @@ from fastapi.staticfiles import StaticFiles
 from fastapi.templating import Jinja2Templates
 from dotenv import load_dotenv
 import markdown
+from app.core.admission import AdmissionMiddleware
+from app.core.profiling import ProfilingMiddleware
+from app.core.replicas import ReadYourWritesMiddleware
 
 # Load environment variables
 load_dotenv()
@@ -21,6 +24,16 @@ def create_app() -> FastAPI:
     # Serve legacy assets (e.g., resume PDF) and any asset-linked resources
     app.mount("/assets", StaticFiles(directory="assets"), name="assets")
     
+    # Keep clients on the primary database for a short window after they write
+    app.add_middleware(ReadYourWritesMiddleware)
+    
+    # Per-route concurrency limits, load shedding and request deadlines
+    app.add_middleware(AdmissionMiddleware)
+    
+    # On-demand profiling (outside admission control, so rendering the profile
+    # holds no lane slot and profiled requests can skip the deadline)
+    app.add_middleware(ProfilingMiddleware)
+    
     return app
 
 # Caching configuration
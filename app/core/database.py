@@ -1,25 +1,35 @@
 import os
 from tortoise import Tortoise
 from dotenv import load_dotenv
+from app.core.replicas import replica_connections_config, start_health_checks, stop_health_checks
 
 # Load environment variables
 load_dotenv()
 
 DATABASE_URL = f"postgres://{os.getenv('DB_USER', 'postgres')}:{os.getenv('DB_PASSWORD', 'password')}@{os.getenv('DB_HOST', 'localhost')}:{os.getenv('DB_PORT', 5432)}/{os.getenv('DB_NAME', 'blog_db')}"
 
+# asyncpg pool size per connection and per worker; also bounds the DB_READ admission lane
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "5"))
+
+PRIMARY_CREDENTIALS = {
+    "host": os.getenv('DB_HOST', 'localhost'),
+    "port": int(os.getenv('DB_PORT', 5432)),
+    "user": os.getenv('DB_USER', 'postgres'),
+    "password": os.getenv('DB_PASSWORD', 'password'),
+    "database": os.getenv('DB_NAME', 'blog_db'),
+    "statement_cache_size": 0,  # Disable prepared statements for pgbouncer compatibility
+    "maxsize": DB_POOL_SIZE,
+}
+
 TORTOISE_ORM = {
     "connections": {
         "default": {
             "engine": "tortoise.backends.asyncpg",
-            "credentials": {
-                "host": os.getenv('DB_HOST', 'localhost'),
-                "port": int(os.getenv('DB_PORT', 5432)),
-                "user": os.getenv('DB_USER', 'postgres'),
-                "password": os.getenv('DB_PASSWORD', 'password'),
-                "database": os.getenv('DB_NAME', 'blog_db'),
-                "statement_cache_size": 0,  # Disable prepared statements for pgbouncer compatibility
-            }
-        }
+            "credentials": PRIMARY_CREDENTIALS,
+        },
+        # Read-only replicas from DB_REPLICA_HOSTS, e.g. a second local
+        # Postgres with DB_REPLICA_HOSTS=localhost:5433
+        **replica_connections_config(PRIMARY_CREDENTIALS),
     },
     "apps": {
         "models": {
@@ -27,13 +37,18 @@ TORTOISE_ORM = {
             "default_connection": "default",
         },
     },
+    # Reads go to healthy replicas, writes to the primary
+    "routers": ["app.core.replicas.ReplicaRouter"],
 }
 
-async def init_db():
+async def init_db(generate_schemas: bool = True):
     """Initialize Tortoise ORM"""
     await Tortoise.init(config=TORTOISE_ORM)
-    await Tortoise.generate_schemas()
+    if generate_schemas:
+        await Tortoise.generate_schemas()
+    await start_health_checks()
 
 async def close_db():
     """Close database connections"""
-    await Tortoise.close_connections()
\ No newline at end of file
+    await stop_health_checks()
+    await Tortoise.close_connections()
@@ -0,0 +1,211 @@
+import os
+import re
+import hmac
+import json
+import asyncio
+from datetime import datetime
+from dotenv import load_dotenv
+
+# Load environment variables
+load_dotenv()
+
+# Profiling is disabled unless a token is configured
+PROFILING_TOKEN = os.getenv("PROFILING_TOKEN", "")
+PROFILE_DIR = os.getenv("PROFILE_DIR", "profiles")
+PROFILE_INTERVAL = float(os.getenv("PROFILE_INTERVAL", "0.001"))  # Sampling interval in seconds
+PROFILE_MAX_SECONDS = int(os.getenv("PROFILE_MAX_SECONDS", "60"))
+PROFILE_MAX_FILES = int(os.getenv("PROFILE_MAX_FILES", "50"))  # Oldest profiles are deleted beyond this
+
+PROFILE_HEADER = b"x-profile"                # Token; profiles this request
+PROFILE_FORMAT_HEADER = b"x-profile-format"  # "speedscope" (default) or "html"
+PROFILE_OUTPUT_HEADER = b"x-profile-output"  # "store" (default) or "return"
+PROFILE_WORKER_HEADER = b"x-profile-worker"  # Seconds; samples the whole worker
+
+class ProfilingMiddleware:
+    """
+    ASGI middleware for on-demand profiling with pyinstrument.
+
+    A request carrying the profiling token in the X-Profile header is
+    profiled end-to-end, covering the route handler, Tortoise queries, Jinja2
+    rendering and markdown_filter. The token is only accepted as a header so
+    it never shows up in access or proxy logs. The profile is written to
+    PROFILE_DIR and named in the X-Profile-File response header, or returned
+    in place of the page with X-Profile-Output: return.
+
+    Adding X-Profile-Worker: <seconds> instead starts a time-boxed sampling
+    profile of the whole worker process and responds straight away.
+
+    Without a configured token every request passes straight through.
+    """
+
+    def __init__(self, app, token: str = PROFILING_TOKEN):
+        self.app = app
+        self.token = token
+        self.worker_task = None
+        self.last_worker_profile = None
+
+    async def __call__(self, scope, receive, send):
+        if not self.token or scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        headers = dict(scope["headers"])
+        supplied = headers.get(PROFILE_HEADER, b"").decode("latin1")
+        if not supplied:
+            await self.app(scope, receive, send)
+            return
+
+        if not hmac.compare_digest(supplied, self.token):
+            await self._send_json(send, 403, {"success": False, "message": "Invalid profiling token."})
+            return
+
+        try:
+            from pyinstrument import Profiler
+        except ImportError:
+            print("Profiling requested but pyinstrument is not installed.")
+            await self.app(scope, receive, send)
+            return
+
+        output_format = headers.get(PROFILE_FORMAT_HEADER, b"speedscope").decode("latin1")
+        if PROFILE_WORKER_HEADER in headers:
+            await self._start_worker_profile(Profiler, headers[PROFILE_WORKER_HEADER], output_format, send)
+        else:
+            await self._profile_request(Profiler, scope, receive, send, headers, output_format)
+
+    async def _profile_request(self, Profiler, scope, receive, send, headers, output_format: str):
+        """Run one request under the profiler, buffering its response"""
+        messages = []
+
+        async def buffered_send(message):
+            messages.append(message)
+
+        # Tells AdmissionMiddleware to let this request run past its deadline
+        scope = {**scope, "profiling": True}
+
+        # Rendering thousands of samples is CPU heavy; keep it off the event loop
+        loop = asyncio.get_running_loop()
+
+        profiler = Profiler(interval=PROFILE_INTERVAL, async_mode="enabled")
+        profiler.start()
+        try:
+            await self.app(scope, receive, buffered_send)
+        except asyncio.CancelledError:
+            # Keep whatever was sampled before the client or server gave up
+            profiler.stop()
+            _, rendered = await loop.run_in_executor(None, _render, profiler, output_format)
+            filename = await loop.run_in_executor(None, _write_profile, f"{scope['path']}-cancelled", output_format, rendered)
+            print(f"Profiled request was cancelled; partial profile written to {filename}")
+            raise
+        finally:
+            if profiler.is_running:
+                profiler.stop()
+
+        content_type, rendered = await loop.run_in_executor(None, _render, profiler, output_format)
+        if headers.get(PROFILE_OUTPUT_HEADER, b"store") == b"return":
+            body = rendered.encode()
+            await send({
+                "type": "http.response.start",
+                "status": 200,
+                "headers": [
+                    (b"content-type", content_type.encode()),
+                    (b"content-length", str(len(body)).encode()),
+                ],
+            })
+            await send({"type": "http.response.body", "body": body})
+            return
+
+        filename = await loop.run_in_executor(None, _write_profile, scope["path"], output_format, rendered)
+        for message in messages:
+            if message["type"] == "http.response.start":
+                message = {**message, "headers": [*message.get("headers", []), (b"x-profile-file", filename.encode())]}
+            await send(message)
+
+    async def _start_worker_profile(self, Profiler, raw_seconds: bytes, output_format: str, send):
+        """Sample everything this worker runs for a bounded number of seconds"""
+        if self.worker_task is not None and not self.worker_task.done():
+            await self._send_json(send, 409, {
+                "success": False,
+                "message": "A worker profile is already running.",
+                "last_profile": self.last_worker_profile,
+            })
+            return
+
+        try:
+            seconds = min(max(int(raw_seconds), 1), PROFILE_MAX_SECONDS)
+        except ValueError:
+            await self._send_json(send, 400, {"success": False, "message": "X-Profile-Worker must be a number of seconds."})
+            return
+
+        # async_mode="disabled" samples the event loop thread regardless of task
+        profiler = Profiler(interval=PROFILE_INTERVAL, async_mode="disabled")
+        profiler.start()
+        self.worker_task = asyncio.create_task(self._finish_worker_profile(profiler, seconds, output_format))
+
+        await self._send_json(send, 202, {
+            "success": True,
+            "message": f"Profiling worker {os.getpid()} for {seconds}s.",
+            "profile_dir": PROFILE_DIR,
+            "last_profile": self.last_worker_profile,
+        })
+
+    async def _finish_worker_profile(self, profiler, seconds: int, output_format: str):
+        """Stop the worker profile after its time box and save it off the event loop"""
+        try:
+            await asyncio.sleep(seconds)
+        finally:
+            profiler.stop()
+
+        try:
+            loop = asyncio.get_running_loop()
+            _, rendered = await loop.run_in_executor(None, _render, profiler, output_format)
+            filename = await loop.run_in_executor(None, _write_profile, f"worker-{os.getpid()}", output_format, rendered)
+            self.last_worker_profile = filename
+            print(f"Worker profile written to {filename}")
+        except Exception as e:
+            # Reported to the next X-Profile-Worker caller as last_profile
+            self.last_worker_profile = f"failed: {e}"
+            print(f"Failed to write worker profile: {e}")
+
+    async def _send_json(self, send, status_code: int, content: dict):
+        body = json.dumps(content).encode()
+        await send({
+            "type": "http.response.start",
+            "status": status_code,
+            "headers": [
+                (b"content-type", b"application/json"),
+                (b"content-length", str(len(body)).encode()),
+            ],
+        })
+        await send({"type": "http.response.body", "body": body})
+
+def _render(profiler, output_format: str) -> tuple:
+    """Render a stopped profiler as (content type, text)"""
+    if output_format == "html":
+        return "text/html; charset=utf-8", profiler.output_html()
+
+    from pyinstrument.renderers import SpeedscopeRenderer
+    return "application/json", profiler.output(renderer=SpeedscopeRenderer())
+
+def _write_profile(label: str, output_format: str, rendered: str) -> str:
+    """Store a rendered profile in PROFILE_DIR and return its path"""
+    os.makedirs(PROFILE_DIR, exist_ok=True)
+
+    slug = re.sub(r"[^\w-]+", "-", label).strip("-") or "root"
+    extension = "html" if output_format == "html" else "speedscope.json"
+    filename = os.path.join(PROFILE_DIR, f"{datetime.now().strftime('%Y%m%d-%H%M%S-%f')}-{slug}.{extension}")
+    with open(filename, "w") as f:
+        f.write(rendered)
+
+    _prune_profiles()
+    return filename
+
+def _prune_profiles():
+    """Delete the oldest profiles so at most PROFILE_MAX_FILES are kept"""
+    # Filenames start with a timestamp, so name order is age order
+    profiles = sorted(os.listdir(PROFILE_DIR))
+    for name in profiles[:max(len(profiles) - PROFILE_MAX_FILES, 0)]:
+        try:
+            os.remove(os.path.join(PROFILE_DIR, name))
+        except FileNotFoundError:
+            # Another worker pruned it first
+            pass
@@ -0,0 +1,226 @@
+import os
+import asyncio
+import itertools
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, Optional
+from tortoise import connections
+from dotenv import load_dotenv
+
+# Load environment variables
+load_dotenv()
+
+PRIMARY_CONNECTION = "default"
+
+# Comma separated host[:port] list, e.g. "localhost:5433,localhost:5434"
+REPLICA_HOSTS = [host.strip() for host in os.getenv("DB_REPLICA_HOSTS", "").split(",") if host.strip()]
+REPLICA_CONNECTIONS = [f"replica_{index}" for index in range(len(REPLICA_HOSTS))]
+
+REPLICA_HEALTH_INTERVAL = float(os.getenv("DB_REPLICA_HEALTH_INTERVAL", "5"))
+REPLICA_HEALTH_TIMEOUT = float(os.getenv("DB_REPLICA_HEALTH_TIMEOUT", "2"))
+REPLICA_MAX_LAG = float(os.getenv("DB_REPLICA_MAX_LAG", "10"))  # Seconds of replay lag tolerated
+READ_YOUR_WRITES_WINDOW = int(os.getenv("DB_READ_YOUR_WRITES_WINDOW", "5"))  # Seconds a client's reads stay on primary after its write
+READ_YOUR_WRITES_COOKIE = "db_primary"
+
+# Replication lag in seconds (0 when caught up or not a standby), plus the
+# standby's WAL receiver. A standby whose stream broke looks caught up while
+# it silently goes stale. The receiver row exists for any role, but its
+# status is NULL unless the role has pg_read_all_stats.
+LAG_QUERY = """
+    SELECT
+        pg_is_in_recovery() AS in_recovery,
+        EXISTS (SELECT 1 FROM pg_stat_wal_receiver) AS has_receiver,
+        (SELECT status FROM pg_stat_wal_receiver LIMIT 1) AS receiver_status,
+        CASE
+            WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+            ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0)
+        END AS lag
+"""
+
+# Replica alias -> currently usable, and the last reported status
+_healthy: Dict[str, bool] = {alias: False for alias in REPLICA_CONNECTIONS}
+_status: Dict[str, Optional[str]] = {alias: None for alias in REPLICA_CONNECTIONS}
+_receiver_status_hidden = set()  # Replicas already warned about missing pg_read_all_stats
+_round_robin = itertools.count()
+_health_task: Optional[asyncio.Task] = None
+
+_force_primary: ContextVar[bool] = ContextVar("force_primary", default=False)
+_request_state: ContextVar[Optional[dict]] = ContextVar("request_state", default=None)
+_last_read_connection: ContextVar[str] = ContextVar("last_read_connection", default=PRIMARY_CONNECTION)
+
+def replica_connections_config(primary_credentials: dict) -> dict:
+    """Tortoise connection entries for the configured replicas"""
+    connections = {}
+    for alias, host in zip(REPLICA_CONNECTIONS, REPLICA_HOSTS):
+        hostname, _, port = host.partition(":")
+        connections[alias] = {
+            "engine": "tortoise.backends.asyncpg",
+            "credentials": {
+                **primary_credentials,
+                "host": hostname,
+                "port": int(port or primary_credentials["port"]),
+                "user": os.getenv("DB_REPLICA_USER", primary_credentials["user"]),
+                "password": os.getenv("DB_REPLICA_PASSWORD", primary_credentials["password"]),
+            },
+        }
+    return connections
+
+class ReplicaRouter:
+    """
+    Tortoise router sending reads to a healthy replica and writes to the primary.
+    A write also pins the rest of the request, and via ReadYourWritesMiddleware
+    the same client's next requests, to the primary.
+    """
+
+    def db_for_read(self, model) -> str:
+        alias = self._choose_replica() or PRIMARY_CONNECTION
+        _last_read_connection.set(alias)
+        return alias
+
+    def db_for_write(self, model) -> str:
+        state = _request_state.get()
+        if state is not None:
+            state["wrote"] = True
+            _force_primary.set(True)
+        return PRIMARY_CONNECTION
+
+    def _choose_replica(self) -> Optional[str]:
+        if _force_primary.get():
+            return None
+        healthy = [alias for alias in REPLICA_CONNECTIONS if _healthy[alias]]
+        if not healthy:
+            return None
+        return healthy[next(_round_robin) % len(healthy)]
+
+@contextmanager
+def use_primary():
+    """Route every read inside the block to the primary"""
+    token = _force_primary.set(True)
+    try:
+        yield
+    finally:
+        _force_primary.reset(token)
+
+class ReadYourWritesMiddleware:
+    """
+    ASGI middleware pinning a client to the primary after it writes.
+
+    A request that writes gets a short-lived cookie back; while the client
+    presents it, its reads skip the replicas on whichever worker serves them.
+    """
+
+    def __init__(self, app):
+        self.app = app
+        self.cookie = (
+            f"{READ_YOUR_WRITES_COOKIE}=1; Max-Age={READ_YOUR_WRITES_WINDOW}; "
+            "Path=/; HttpOnly; SameSite=Lax"
+        ).encode()
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not REPLICA_CONNECTIONS:
+            await self.app(scope, receive, send)
+            return
+
+        state = {"wrote": False}
+
+        async def pinning_send(message):
+            if message["type"] == "http.response.start" and state["wrote"]:
+                message = {**message, "headers": [*message.get("headers", []), (b"set-cookie", self.cookie)]}
+            await send(message)
+
+        state_token = _request_state.set(state)
+        primary_token = _force_primary.set(_has_pin_cookie(scope))
+        try:
+            await self.app(scope, receive, pinning_send)
+        finally:
+            _force_primary.reset(primary_token)
+            _request_state.reset(state_token)
+
+def _has_pin_cookie(scope) -> bool:
+    for name, value in scope["headers"]:
+        if name == b"cookie":
+            for cookie in value.decode("latin1").split(";"):
+                if cookie.strip() == f"{READ_YOUR_WRITES_COOKIE}=1":
+                    return True
+    return False
+
+def last_read_connection() -> str:
+    """Alias the most recent read in this context was routed to"""
+    return _last_read_connection.get()
+
+def mark_unhealthy(alias: str):
+    """Take a replica out of rotation until the next successful health check"""
+    if alias in _healthy:
+        _healthy[alias] = False
+
+async def check_replicas() -> Dict[str, bool]:
+    """Probe each replica for reachability, WAL streaming and replication lag"""
+    for alias in REPLICA_CONNECTIONS:
+        try:
+            connection = connections.get(alias)
+            rows = await asyncio.wait_for(connection.execute_query_dict(LAG_QUERY), REPLICA_HEALTH_TIMEOUT)
+            row = rows[0]
+            lag = float(row["lag"])
+            if row["in_recovery"] and row["has_receiver"] and row["receiver_status"] is None:
+                # Streaming state unknown; only the lag check below applies
+                if alias not in _receiver_status_hidden:
+                    _receiver_status_hidden.add(alias)
+                    print(
+                        f"Replica {alias}: the database role cannot read pg_stat_wal_receiver.status. "
+                        "Grant it pg_read_all_stats so a broken WAL stream is detected; "
+                        "until then only replication lag is checked."
+                    )
+            if row["in_recovery"] and not row["has_receiver"]:
+                status = "not receiving WAL from the primary"
+            elif row["in_recovery"] and row["receiver_status"] not in (None, "streaming"):
+                status = "not streaming WAL from the primary"
+            elif lag > REPLICA_MAX_LAG:
+                status = f"more than {REPLICA_MAX_LAG:g}s behind"
+            else:
+                status = None
+            _report(alias, status)
+        except Exception as e:
+            _report(alias, "unreachable", f" ({e})")
+    return dict(_healthy)
+
+def _report(alias: str, status: Optional[str], detail: str = ""):
+    """Update a replica's health, logging only when its status changes"""
+    healthy = status is None
+    changed = status != _status[alias] or healthy != _healthy[alias]
+    _healthy[alias] = healthy
+    _status[alias] = status
+    if not changed:
+        return
+    if healthy:
+        print(f"Replica {alias} is healthy. Routing reads to it.")
+    else:
+        print(f"Replica {alias} is {status}{detail}. Reading from primary.")
+
+async def _health_check_loop():
+    while True:
+        await asyncio.sleep(REPLICA_HEALTH_INTERVAL)
+        await check_replicas()
+
+async def start_health_checks():
+    """
+    Run an initial replica check and keep checking in the background.
+    The initial check also warms each reachable replica's pool before the
+    worker serves traffic, bounded by REPLICA_HEALTH_TIMEOUT per replica.
+    """
+    global _health_task
+    if not REPLICA_CONNECTIONS:
+        return
+    await check_replicas()
+    _health_task = asyncio.create_task(_health_check_loop())
+
+async def stop_health_checks():
+    """Cancel the background replica checks"""
+    global _health_task
+    if _health_task is None:
+        return
+    _health_task.cancel()
+    try:
+        await _health_task
+    except asyncio.CancelledError:
+        pass
+    _health_task = None
@@ -0,0 +1,83 @@
+import os
+from tortoise import connections
+from dotenv import load_dotenv
+from app.core.config import templates, markdown_filter
+from app.core.database import DB_POOL_SIZE
+from app.services.email import template_env as email_template_env
+
+# Load environment variables
+load_dotenv()
+
+# Production server configuration
+SERVER_HOST = os.getenv("HOST", "0.0.0.0")
+SERVER_PORT = int(os.getenv("PORT", "8000"))
+WEB_CONCURRENCY = int(os.getenv("WEB_CONCURRENCY", "0"))  # 0 = one worker per core
+# Each worker opens up to DB_POOL_SIZE connections to the primary and to each
+# replica, so every Postgres server sees up to workers * DB_POOL_SIZE from this
+# box. Keep that under its max_connections (100 by default) minus headroom.
+DB_CONNECTION_BUDGET = int(os.getenv("DB_CONNECTION_BUDGET", "90"))
+KEEPALIVE_TIMEOUT = int(os.getenv("KEEPALIVE_TIMEOUT", "30"))  # Should exceed the proxy's idle timeout
+BACKLOG = int(os.getenv("BACKLOG", "2048"))
+GRACEFUL_SHUTDOWN_TIMEOUT = int(os.getenv("GRACEFUL_SHUTDOWN_TIMEOUT", "30"))
+ACCESS_LOG = os.getenv("ACCESS_LOG", "true").lower() == "true"
+
+def is_production() -> bool:
+    """Check whether the app should run with the production server settings"""
+    return os.getenv("APP_ENV", "development").lower() == "production"
+
+def get_worker_count() -> int:
+    """
+    Number of worker processes, defaulting to the available core count
+    capped so the workers' pools fit in DB_CONNECTION_BUDGET.
+    """
+    max_workers = max(DB_CONNECTION_BUDGET // DB_POOL_SIZE, 1)
+    if WEB_CONCURRENCY > 0:
+        if WEB_CONCURRENCY > max_workers:
+            print(
+                f"WEB_CONCURRENCY={WEB_CONCURRENCY} may open {WEB_CONCURRENCY * DB_POOL_SIZE} "
+                f"connections per database, over DB_CONNECTION_BUDGET={DB_CONNECTION_BUDGET}."
+            )
+        return WEB_CONCURRENCY
+    try:
+        # Respect CPU affinity / container cpusets where available
+        cores = max(len(os.sched_getaffinity(0)), 1)
+    except AttributeError:
+        cores = os.cpu_count() or 1
+    return min(cores, max_workers)
+
+def get_server_config() -> dict:
+    """Keyword arguments for uvicorn.run in production mode"""
+    return {
+        "host": SERVER_HOST,
+        "port": SERVER_PORT,
+        "workers": get_worker_count(),
+        "loop": "uvloop",
+        "http": "httptools",
+        "backlog": BACKLOG,
+        "timeout_keep_alive": KEEPALIVE_TIMEOUT,
+        # On SIGTERM uvicorn stops accepting, waits for in-flight requests
+        # (including contact form sends) and only then runs lifespan shutdown
+        "timeout_graceful_shutdown": GRACEFUL_SHUTDOWN_TIMEOUT,
+        "proxy_headers": True,
+        "forwarded_allow_ips": os.getenv("FORWARDED_ALLOW_IPS", "127.0.0.1"),
+        "access_log": ACCESS_LOG,
+    }
+
+async def warm_up():
+    """
+    Prime per-worker state before the worker starts accepting connections.
+    Uvicorn only begins serving once lifespan startup has completed.
+    """
+    # Open a pooled database connection. Replica pools were already opened,
+    # with a timeout, by the health check that init_db runs
+    await connections.get("default").execute_query("SELECT 1")
+
+    # Compile every page and email template into the Jinja2 caches
+    for template_name in templates.env.list_templates(extensions=["html"]):
+        if not template_name.startswith("emails/"):
+            templates.env.get_template(template_name)
+    for template_name in email_template_env.list_templates(extensions=["html"]):
+        email_template_env.get_template(template_name)
+
+    # Load the markdown extensions (codehilite pulls in pygments lazily)
+    markdown_filter("# warm-up\n\n```python\npass\n```")
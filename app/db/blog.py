@@ -1,30 +1,50 @@
-from typing import List, Optional
+from typing import Any, Awaitable, Callable, List, Optional
+from asyncpg.exceptions import CannotConnectNowError, PostgresConnectionError
+from tortoise.exceptions import DBConnectionError
+from app.core.replicas import PRIMARY_CONNECTION, last_read_connection, mark_unhealthy, use_primary
 from app.models.blog import BlogPost
 
+# Failures of the replica itself rather than of the query; anything else is
+# re-raised unchanged so a bad query can't knock replicas out of rotation
+REPLICA_FAILURES = (DBConnectionError, PostgresConnectionError, CannotConnectNowError, OSError)
+
+async def _read(query: Callable[[], Awaitable[Any]]) -> Any:
+    """Run a read query, retrying on the primary if its replica is unreachable"""
+    try:
+        return await query()
+    except REPLICA_FAILURES as e:
+        replica = last_read_connection()
+        if replica == PRIMARY_CONNECTION:
+            raise
+        print(f"Read from {replica} failed: {e}. Retrying on primary.")
+        mark_unhealthy(replica)
+        with use_primary():
+            return await query()
+
 class BlogDatabase:
     """Wrapper class for blog database operations using Tortoise ORM"""
     
     @staticmethod
     async def get_all_posts() -> List[BlogPost]:
         """Fetch all blog posts"""
-        return await BlogPost.all()
+        return await _read(lambda: BlogPost.all())
     
     @staticmethod
     async def get_post_by_id(post_id: int) -> Optional[BlogPost]:
         """Fetch a specific blog post by ID"""
-        return await BlogPost.get_or_none(id=post_id)
+        return await _read(lambda: BlogPost.get_or_none(id=post_id))
     
     @staticmethod
     async def get_posts_by_tag(tag: str) -> List[BlogPost]:
         """Fetch blog posts that contain a specific tag"""
-        return await BlogPost.get_posts_by_tag(tag)
+        return await _read(lambda: BlogPost.get_posts_by_tag(tag))
     
     @staticmethod
     async def search_posts(search_term: str) -> List[BlogPost]:
         """Search blog posts by text content and title"""
-        return await BlogPost.search_posts(search_term)
+        return await _read(lambda: BlogPost.search_posts(search_term))
     
     @staticmethod
     async def get_post_by_slug(slug: str) -> Optional[BlogPost]:
         """Fetch a blog post by its URL slug"""
-        return await BlogPost.get_by_slug(slug)
\ No newline at end of file
+        return await _read(lambda: BlogPost.get_by_slug(slug))
\ No newline at end of file
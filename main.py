@@ -3,12 +3,16 @@ from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from app.core.config import create_app
 from app.core.database import init_db, close_db
+from app.core.server import is_production, get_server_config, warm_up
 from app.routes import blog, sections
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     # Startup
-    await init_db()
+    # In production the schema comes from the aerich migrations; concurrent
+    # CREATE TABLE from every worker can fail on a fresh database
+    await init_db(generate_schemas=not is_production())
+    await warm_up()
     yield
     # Shutdown
     await close_db()
@@ -21,4 +25,8 @@ app.include_router(sections.router)
 app.include_router(blog.router)
 
 if __name__ == "__main__":
-    uvicorn.run("main:app", host="0.0.0.0", port=8000, reload=True)
+    if is_production():
+        # APP_ENV=production python main.py
+        uvicorn.run("main:app", **get_server_config())
+    else:
+        uvicorn.run("main:app", host="0.0.0.0", port=8000, reload=True)